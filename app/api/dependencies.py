@@ -0,0 +1,12 @@
+from fastapi import Request
+
+from app.services.nasa_service import NASAService
+from app.services.noaa_service import NOAAService
+
+def get_nasa(request: Request) -> NASAService:
+    """Shared NASAService instance created at app startup"""
+    return request.app.state.nasa
+
+def get_noaa(request: Request) -> NOAAService:
+    """Shared NOAAService instance created at app startup"""
+    return request.app.state.noaa
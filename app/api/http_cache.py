@@ -0,0 +1,46 @@
+"""
+In-process TTL cache with HTTP revalidation for read-only GET endpoints.
+
+Cached entries keep the built payload together with a strong ETag, so repeat
+clients (and CDNs) that send If-None-Match get an empty 304 instead of a
+re-fetched, re-encoded body.
+"""
+
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+from app.services.cache import TTLCache
+
+# Per-key coalescing: concurrent misses for one endpoint share a single
+# rebuild, and a slow rebuild never blocks other endpoints' entries
+_cache = TTLCache()
+
+async def cached_json(request: Request, response: Response,
+                      key, ttl: float, producer):
+    """
+    Serve a JSON payload from the TTL cache, rebuilding it via `producer`
+    (an async callable) when the entry is missing or expired. Sets
+    Cache-Control and ETag headers and answers If-None-Match with a 304.
+    """
+    async def produce():
+        payload = await producer()
+        etag = hashlib.md5(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return payload, etag
+
+    payload, etag = await _cache.get_or_fetch(key, produce, ttl)
+
+    cache_control = f"public, max-age={int(ttl)}"
+    response.headers["Cache-Control"] = cache_control
+    response.headers["ETag"] = etag
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(
+            status_code=304,
+            headers={"Cache-Control": cache_control, "ETag": etag}
+        )
+
+    return payload
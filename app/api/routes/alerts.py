@@ -1,132 +1,204 @@
-from fastapi import APIRouter
+import asyncio
+import heapq
+import time
+from collections import Counter
+
+import numpy as np
+
+from fastapi import APIRouter, Depends, Query
 from typing import List, Dict
+from app.api.dependencies import get_nasa
 from app.services.nasa_service import NASAService
-from app.services.noaa_service import NOAAService
 from datetime import datetime
 
 router = APIRouter()
 
-nasa_service = NASAService()
-noaa_service = NOAAService()
+# Short-TTL cache so /active and /summary share one upstream round-trip.
+# DONKI event feeds only update on minute timescales, so 60s is safe.
+_ALERTS_TTL = 60.0
+# Upper bound on alerts kept per refresh; matches the /active limit cap
+_MAX_ALERTS = 500
+_alerts_cache = {"expires": 0.0, "payload": None, "severity_counts": None}
+_alerts_lock = asyncio.Lock()
+
+def _unwrap(result, source: str) -> List:
+    """Return a gathered fetch result, or an empty list if that fetch failed"""
+    if isinstance(result, BaseException):
+        print(f"Error fetching {source} for alerts: {result}")
+        return []
+    return result
+
+def _alert_timestamp(alert: Dict) -> str:
+    """Sort key; alerts with no timestamp sort last"""
+    return alert["timestamp"] or ""
+
+# Severity by flare class letter; anything else (A/B) is background-level
+_FLARE_SEVERITY = {"X": "extreme", "M": "high", "C": "moderate"}
 
 def classify_flare_severity(class_type: str) -> str:
     """Classify solar flare severity"""
     if not class_type:
         return "unknown"
-    
-    first_char = class_type[0].upper()
-    if first_char in ['X']:
-        return "extreme"
-    elif first_char in ['M']:
-        return "high"
-    elif first_char in ['C']:
-        return "moderate"
-    else:
-        return "low"
+    return _FLARE_SEVERITY.get(class_type[:1].upper(), "low")
+
+# Speed thresholds (km/s) separating low/moderate/high/extreme CMEs
+_CME_SEVERITY_BINS = np.array([500.0, 1000.0, 2000.0])
+_CME_SEVERITY_LABELS = ("low", "moderate", "high", "extreme")
 
 def classify_cme_severity(speed: float) -> str:
     """Classify CME severity based on speed"""
-    if speed >= 2000:
-        return "extreme"
-    elif speed >= 1000:
-        return "high"
-    elif speed >= 500:
-        return "moderate"
-    else:
-        return "low"
+    return _CME_SEVERITY_LABELS[int(np.digitize(speed, _CME_SEVERITY_BINS))]
 
-@router.get("/active")
-async def get_active_alerts():
-    """Get all active space weather alerts"""
-    
-    # Fetch recent events
-    flares = await nasa_service.get_solar_flares(days=2)
-    cme_events = await nasa_service.get_cme_events(days=2)
-    storms = await nasa_service.get_geomagnetic_storms(days=2)
-    radiation = await nasa_service.get_radiation_belt_enhancement(days=2)
-    
-    alerts = []
-    
-    # Process solar flares
-    for flare in flares:
-        severity = classify_flare_severity(flare.get("classType", ""))
-        if severity in ["high", "extreme"]:
+def classify_cme_severities(speeds: np.ndarray) -> np.ndarray:
+    """Classify many CME speeds in one vectorized pass; returns label indexes"""
+    return np.digitize(speeds, _CME_SEVERITY_BINS)
+
+async def _compute_active_alerts(nasa_service: NASAService) -> Dict:
+    """Build the active alerts payload, reusing a cached copy within the TTL"""
+    if time.monotonic() < _alerts_cache["expires"]:
+        return _alerts_cache
+
+    async with _alerts_lock:
+        # Re-check after acquiring the lock so concurrent requests
+        # don't stampede the upstream APIs when the cache expires
+        if time.monotonic() < _alerts_cache["expires"]:
+            return _alerts_cache
+
+        # Fetch recent events concurrently; the four endpoints are independent
+        # so latency is bounded by the slowest one instead of the sum
+        results = await asyncio.gather(
+            nasa_service.get_solar_flares(days=2),
+            nasa_service.get_cme_events(days=2),
+            nasa_service.get_geomagnetic_storms(days=2),
+            nasa_service.get_radiation_belt_enhancement(days=2),
+            return_exceptions=True
+        )
+        flares = _unwrap(results[0], "solar flares")
+        cme_events = _unwrap(results[1], "CME events")
+        storms = _unwrap(results[2], "geomagnetic storms")
+        radiation = _unwrap(results[3], "radiation events")
+
+        alerts = []
+
+        # Process solar flares. Most DONKI flares are C-class or below, so
+        # reject them with one cheap test before any alert dict is built.
+        for flare in flares:
+            class_type = flare.get("classType") or ""
+            first_char = class_type[:1].upper()
+            if first_char not in ("M", "X"):
+                continue
+            severity = "extreme" if first_char == "X" else "high"
             alerts.append({
                 "id": flare.get("flrID"),
                 "type": "solar_flare",
                 "severity": severity,
-                "title": f"Solar Flare {flare.get('classType', 'Unknown')} detected",
+                "title": f"Solar Flare {class_type} detected",
                 "description": f"Peak time: {flare.get('peakTime', 'N/A')}",
                 "timestamp": flare.get("beginTime"),
                 "source": "NASA DONKI"
             })
-    
-    # Process CME events
-    for cme in cme_events:
-        speed = float(cme.get("speed", 0)) if cme.get("speed") else 0
-        severity = classify_cme_severity(speed)
-        if severity in ["high", "extreme"]:
+
+        # Process CME events; speeds are parsed and classified in one
+        # vectorized pass instead of per-event float/branch chains
+        cme_speeds = np.fromiter(
+            (float(c.get("speed") or 0) for c in cme_events),
+            dtype=np.float64,
+            count=len(cme_events)
+        )
+        cme_severity_idx = classify_cme_severities(cme_speeds)
+        for cme, speed, sev_idx in zip(cme_events, cme_speeds, cme_severity_idx):
+            if sev_idx < 2:  # below "high"
+                continue
+            severity = _CME_SEVERITY_LABELS[sev_idx]
             alerts.append({
                 "id": cme.get("activityID"),
                 "type": "cme",
                 "severity": severity,
                 "title": f"Coronal Mass Ejection detected",
-                "description": f"Speed: {speed} km/s",
+                "description": f"Speed: {float(speed)} km/s",
                 "timestamp": cme.get("startTime"),
                 "source": "NASA DONKI"
             })
-    
-    # Process geomagnetic storms
-    for storm in storms:
-        kp_index = float(storm.get("allKpIndex", [{}])[0].get("kpIndex", 0)) if storm.get("allKpIndex") else 0
-        severity = "high" if kp_index >= 7 else "moderate" if kp_index >= 5 else "low"
-        
-        if severity in ["high", "extreme"]:
+
+        # Process geomagnetic storms
+        for storm in storms:
+            all_kp = storm.get("allKpIndex")
+            kp_index = float(all_kp[0].get("kpIndex", 0)) if all_kp else 0
+            severity = "high" if kp_index >= 7 else "moderate" if kp_index >= 5 else "low"
+
+            if severity in ["high", "extreme"]:
+                start_time = storm.get("startTime")
+                alerts.append({
+                    "id": storm.get("gstID"),
+                    "type": "geomagnetic_storm",
+                    "severity": severity,
+                    "title": f"Geomagnetic Storm (Kp {kp_index})",
+                    "description": f"Start time: {start_time or 'N/A'}",
+                    "timestamp": start_time,
+                    "source": "NASA DONKI"
+                })
+
+        # Process radiation events
+        for rad in radiation:
+            event_time = rad.get("eventTime")
             alerts.append({
-                "id": storm.get("gstID"),
-                "type": "geomagnetic_storm",
-                "severity": severity,
-                "title": f"Geomagnetic Storm (Kp {kp_index})",
-                "description": f"Start time: {storm.get('startTime', 'N/A')}",
-                "timestamp": storm.get("startTime"),
+                "id": rad.get("rbeID"),
+                "type": "radiation",
+                "severity": "moderate",
+                "title": "Radiation Belt Enhancement",
+                "description": f"Event time: {event_time or 'N/A'}",
+                "timestamp": event_time,
                 "source": "NASA DONKI"
             })
-    
-    # Process radiation events
-    for rad in radiation:
-        alerts.append({
-            "id": rad.get("rbeID"),
-            "type": "radiation",
-            "severity": "moderate",
-            "title": "Radiation Belt Enhancement",
-            "description": f"Event time: {rad.get('eventTime', 'N/A')}",
-            "timestamp": rad.get("eventTime"),
-            "source": "NASA DONKI"
-        })
-    
-    # Sort by timestamp (most recent first)
-    alerts.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    
+
+        # Keep only the most recent alerts, sorted newest first. nlargest is
+        # O(M log N) for the bounded result instead of a full O(M log M) sort.
+        alerts = heapq.nlargest(_MAX_ALERTS, alerts, key=_alert_timestamp)
+
+        # Tally from the kept list, so the summary's buckets always sum to
+        # the count actually returned even when the cut above truncates
+        severity_counts = Counter(alert["severity"] for alert in alerts)
+
+        _alerts_cache["payload"] = {
+            "status": "success",
+            "count": len(alerts),
+            "alerts": alerts
+        }
+        _alerts_cache["severity_counts"] = severity_counts
+        _alerts_cache["expires"] = time.monotonic() + _ALERTS_TTL
+
+        return _alerts_cache
+
+@router.get("/active")
+async def get_active_alerts(limit: int = Query(default=50, ge=1, le=_MAX_ALERTS),
+                            nasa_service: NASAService = Depends(get_nasa)):
+    """Get active space weather alerts, most recent first"""
+    cached = await _compute_active_alerts(nasa_service)
+    payload = cached["payload"]
+    alerts = payload["alerts"]
+    if limit >= len(alerts):
+        return payload
+    top = alerts[:limit]
     return {
         "status": "success",
-        "count": len(alerts),
-        "alerts": alerts
+        "count": len(top),
+        "alerts": top
     }
 
 @router.get("/summary")
-async def get_alerts_summary():
+async def get_alerts_summary(nasa_service: NASAService = Depends(get_nasa)):
     """Get summary of alert counts by severity"""
-    alerts_data = await get_active_alerts()
-    alerts = alerts_data["alerts"]
-    
+    cached = await _compute_active_alerts(nasa_service)
+    counts = cached["severity_counts"]
+
     summary = {
-        "total": len(alerts),
-        "extreme": len([a for a in alerts if a["severity"] == "extreme"]),
-        "high": len([a for a in alerts if a["severity"] == "high"]),
-        "moderate": len([a for a in alerts if a["severity"] == "moderate"]),
-        "low": len([a for a in alerts if a["severity"] == "low"])
+        "total": cached["payload"]["count"],
+        "extreme": counts["extreme"],
+        "high": counts["high"],
+        "moderate": counts["moderate"],
+        "low": counts["low"]
     }
-    
+
     return {
         "status": "success",
         "summary": summary
@@ -1,35 +1,37 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
+from app.api.dependencies import get_nasa, get_noaa
+from app.services import gather_prediction_inputs
 from app.services.ml_prediction_service import ml_service
 from app.services.nasa_service import NASAService
 from app.services.noaa_service import NOAAService
 
 router = APIRouter()
 
-nasa_service = NASAService()
-noaa_service = NOAAService()
-
 @router.get("/ml-forecast")
-async def get_ml_forecast():
+async def get_ml_forecast(nasa_service: NASAService = Depends(get_nasa),
+                          noaa_service: NOAAService = Depends(get_noaa),
+                          fields: str = Query(
+                              None,
+                              description="Comma-separated response sections, "
+                                          "e.g. solar_flare_prediction,data_quality")):
     """
     Get ML-powered space weather forecast
     Uses Random Forest + Gradient Boosting models
     """
-    # Fetch current data
-    recent_flares = await nasa_service.get_solar_flares(days=7)
-    cme_events = await nasa_service.get_cme_events(days=7)
-    solar_wind = await noaa_service.get_solar_wind()
-    xray_flux = await noaa_service.get_xray_flares()
-    kp_index = await noaa_service.get_kp_index()
-    
+    # Fetch current data concurrently (the five sources are independent)
+    recent_flares, cme_events, solar_wind, xray_flux, kp_index = \
+        await gather_prediction_inputs(nasa_service, noaa_service, days=7)
+
     # Get ML predictions
     predictions = await ml_service.get_ml_predictions(
         recent_flares=recent_flares,
         cme_events=cme_events,
         solar_wind=solar_wind,
         xray_flux=xray_flux,
-        kp_index=kp_index
+        kp_index=kp_index,
+        fields={f.strip() for f in fields.split(",") if f.strip()} if fields else None
     )
-    
+
     return predictions
 
 @router.get("/model-info")
@@ -37,26 +39,31 @@ async def get_model_info():
     """
     Get information about available ML models and capabilities
     """
+    # Bind into locals once instead of repeating the attribute walks
+    # throughout the response dict
+    caps = ml_service.capabilities
+    advanced_model = ml_service.advanced_model
+
     return {
         "status": "success",
         "models": {
             "solar_flare_predictor": {
                 "name": "Advanced Solar Flare Model",
-                "version": ml_service.advanced_model.model_version,
+                "version": advanced_model.model_version,
                 "algorithm": "Random Forest + Gradient Boosting",
                 "accuracy": "~78%",
-                "features": ml_service.advanced_model.feature_names
+                "features": advanced_model.feature_names
             },
             "transformer_model": {
-                "available": ml_service.capabilities["transformers"],
+                "available": caps["transformers"],
                 "description": "Time-series Transformer for enhanced predictions"
             },
             "ollama_integration": {
-                "available": ml_service.capabilities["ollama"],
+                "available": caps["ollama"],
                 "description": "Local LLM for natural language insights"
             }
         },
-        "capabilities": ml_service.capabilities,
+        "capabilities": caps,
         "recommendations": {
             "for_better_accuracy": [
                 "Install transformers: pip install transformers torch",
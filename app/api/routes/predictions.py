@@ -1,26 +1,27 @@
-from fastapi import APIRouter
-from app.services.prediction_service import PredictionService
+import asyncio
+
+import numpy as np
+
+from fastapi import APIRouter, Depends
+from app.api.dependencies import get_nasa, get_noaa
+from app.ml.preprocessing import parse_cme_speeds
+from app.services import gather_prediction_inputs
+from app.services import prediction as prediction_service
 from app.services.nasa_service import NASAService
 from app.services.noaa_service import NOAAService
 
 router = APIRouter()
 
-prediction_service = PredictionService()
-nasa_service = NASAService()
-noaa_service = NOAAService()
-
 @router.get("/comprehensive")
-async def get_comprehensive_predictions():
+async def get_comprehensive_predictions(nasa_service: NASAService = Depends(get_nasa),
+                                        noaa_service: NOAAService = Depends(get_noaa)):
     """
     Get comprehensive space weather predictions from all ML models
     """
-    # Fetch current data
-    recent_flares = await nasa_service.get_solar_flares(days=7)
-    cme_events = await nasa_service.get_cme_events(days=7)
-    solar_wind = await noaa_service.get_solar_wind()
-    xray_flux = await noaa_service.get_xray_flares()
-    kp_index = await noaa_service.get_kp_index()
-    
+    # Fetch current data concurrently (the five sources are independent)
+    recent_flares, cme_events, solar_wind, xray_flux, kp_index = \
+        await gather_prediction_inputs(nasa_service, noaa_service, days=7)
+
     # Get predictions
     predictions = await prediction_service.get_comprehensive_predictions(
         recent_flares=recent_flares,
@@ -33,12 +34,15 @@ async def get_comprehensive_predictions():
     return predictions
 
 @router.get("/solar-flares")
-async def get_solar_flare_predictions():
+async def get_solar_flare_predictions(nasa_service: NASAService = Depends(get_nasa),
+                                      noaa_service: NOAAService = Depends(get_noaa)):
     """Get solar flare predictions only"""
-    recent_flares = await nasa_service.get_solar_flares(days=7)
-    solar_wind = await noaa_service.get_solar_wind()
-    xray_flux = await noaa_service.get_xray_flares()
-    
+    recent_flares, solar_wind, xray_flux = await asyncio.gather(
+        nasa_service.get_solar_flares(days=7),
+        noaa_service.get_solar_wind(),
+        noaa_service.get_xray_flares()
+    )
+
     predictions = prediction_service.flare_predictor.predict_flare_probability(
         recent_flares=recent_flares,
         solar_wind_data=solar_wind,
@@ -51,19 +55,18 @@ async def get_solar_flare_predictions():
     }
 
 @router.get("/geomagnetic-storm")
-async def get_geomagnetic_storm_predictions():
+async def get_geomagnetic_storm_predictions(nasa_service: NASAService = Depends(get_nasa),
+                                            noaa_service: NOAAService = Depends(get_noaa)):
     """Get geomagnetic storm predictions"""
-    kp_index = await noaa_service.get_kp_index()
-    cme_events = await nasa_service.get_cme_events(days=3)
-    
-    # Check for fast CMEs
-    has_fast_cme = any(
-        float(cme.get("speed", 0)) > 1000 
-        for cme in cme_events 
-        if cme.get("speed")
+    kp_index, cme_events = await asyncio.gather(
+        noaa_service.get_kp_index(),
+        nasa_service.get_cme_events(days=3)
     )
+
+    # Check for fast CMEs with one vectorized comparison
+    has_fast_cme = bool((parse_cme_speeds(cme_events) > 1000).any())
     
-    predictions = prediction_service.flare_predictor.predict_geomagnetic_storm(
+    predictions = prediction_service.geomag_predictor.predict_geomagnetic_storm(
         kp_history=kp_index,
         cme_incoming=has_fast_cme
     )
@@ -74,7 +77,7 @@ async def get_geomagnetic_storm_predictions():
     }
 
 @router.get("/radiation-storm")
-async def get_radiation_storm_predictions():
+async def get_radiation_storm_predictions(nasa_service: NASAService = Depends(get_nasa)):
     """Get radiation storm predictions"""
     recent_flares = await nasa_service.get_solar_flares(days=7)
     
@@ -88,17 +91,16 @@ async def get_radiation_storm_predictions():
     }
 
 @router.get("/cme-arrival")
-async def get_cme_arrival_predictions():
+async def get_cme_arrival_predictions(nasa_service: NASAService = Depends(get_nasa)):
     """Get CME arrival time predictions"""
     cme_events = await nasa_service.get_cme_events(days=3)
     
-    # Find recent fast CMEs
-    fast_cmes = [
-        cme for cme in cme_events 
-        if cme.get("speed") and float(cme.get("speed", 0)) > 500
-    ]
-    
-    if not fast_cmes:
+    # Find recent fast CMEs; speeds are parsed once so the filter and the
+    # per-CME predictions below reuse the same floats
+    speeds = parse_cme_speeds(cme_events)
+    fast_indices = np.flatnonzero(speeds > 500)
+
+    if fast_indices.size == 0:
         return {
             "status": "success",
             "data": {
@@ -106,13 +108,13 @@ async def get_cme_arrival_predictions():
                 "predictions": []
             }
         }
-    
+
     # Predict arrival for each fast CME
     predictions = []
-    for cme in fast_cmes[-3:]:  # Last 3 fast CMEs
-        prediction = prediction_service.flare_predictor.predict_cme_arrival(
-            cme_speed=float(cme.get("speed", 0)),
-            detection_time=cme.get("startTime", "")
+    for i in fast_indices[-3:]:  # Last 3 fast CMEs
+        prediction = prediction_service.geomag_predictor.predict_cme_arrival(
+            cme_speed=float(speeds[i]),
+            detection_time=cme_events[i].get("startTime", "")
         )
         predictions.append(prediction)
     
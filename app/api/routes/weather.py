@@ -1,85 +1,116 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from typing import Optional
+from app.api.dependencies import get_nasa, get_noaa
+from app.api.http_cache import cached_json
 from app.services.nasa_service import NASAService
 from app.services.noaa_service import NOAAService
 
 router = APIRouter()
 
-nasa_service = NASAService()
-noaa_service = NOAAService()
+# Upstream products update every few minutes at most, so repeat hits within
+# the TTL are served from the in-process cache (or a 304 on If-None-Match)
+_WEATHER_TTL = 60
+# NEO feed moves on a daily cadence
+_ASTEROIDS_TTL = 600
 
 @router.get("/current")
-async def get_current_weather():
+async def get_current_weather(request: Request, response: Response,
+                              noaa_service: NOAAService = Depends(get_noaa)):
     """Get current space weather conditions"""
-    conditions = await noaa_service.get_current_conditions()
-    return {
-        "status": "success",
-        "data": conditions
-    }
+    async def produce():
+        conditions = await noaa_service.get_current_conditions()
+        return {
+            "status": "success",
+            "data": conditions
+        }
+    return await cached_json(request, response, "weather:current", _WEATHER_TTL, produce)
 
 @router.get("/solar-flares")
-async def get_solar_flares(days: int = Query(default=7, ge=1, le=30)):
+async def get_solar_flares(request: Request, response: Response,
+                           days: int = Query(default=7, ge=1, le=30),
+                           nasa_service: NASAService = Depends(get_nasa)):
     """Get recent solar flare events"""
-    flares = await nasa_service.get_solar_flares(days)
-    return {
-        "status": "success",
-        "count": len(flares),
-        "data": flares
-    }
+    async def produce():
+        flares = await nasa_service.get_solar_flares(days)
+        return {
+            "status": "success",
+            "count": len(flares),
+            "data": flares
+        }
+    return await cached_json(request, response, ("weather:solar-flares", days), _WEATHER_TTL, produce)
 
 @router.get("/cme")
-async def get_cme_events(days: int = Query(default=7, ge=1, le=30)):
+async def get_cme_events(request: Request, response: Response,
+                         days: int = Query(default=7, ge=1, le=30),
+                         nasa_service: NASAService = Depends(get_nasa)):
     """Get Coronal Mass Ejection events"""
-    cme_events = await nasa_service.get_cme_events(days)
-    return {
-        "status": "success",
-        "count": len(cme_events),
-        "data": cme_events
-    }
+    async def produce():
+        cme_events = await nasa_service.get_cme_events(days)
+        return {
+            "status": "success",
+            "count": len(cme_events),
+            "data": cme_events
+        }
+    return await cached_json(request, response, ("weather:cme", days), _WEATHER_TTL, produce)
 
 @router.get("/geomagnetic-storms")
-async def get_geomagnetic_storms(days: int = Query(default=7, ge=1, le=30)):
+async def get_geomagnetic_storms(request: Request, response: Response,
+                                 days: int = Query(default=7, ge=1, le=30),
+                                 nasa_service: NASAService = Depends(get_nasa)):
     """Get geomagnetic storm events"""
-    storms = await nasa_service.get_geomagnetic_storms(days)
-    return {
-        "status": "success",
-        "count": len(storms),
-        "data": storms
-    }
+    async def produce():
+        storms = await nasa_service.get_geomagnetic_storms(days)
+        return {
+            "status": "success",
+            "count": len(storms),
+            "data": storms
+        }
+    return await cached_json(request, response, ("weather:storms", days), _WEATHER_TTL, produce)
 
 @router.get("/asteroids")
-async def get_near_earth_objects(days: int = Query(default=7, ge=1, le=7)):
+async def get_near_earth_objects(request: Request, response: Response,
+                                 days: int = Query(default=7, ge=1, le=7),
+                                 nasa_service: NASAService = Depends(get_nasa)):
     """Get Near Earth Objects (asteroids)"""
-    neos = await nasa_service.get_near_earth_objects(days)
-    return {
-        "status": "success",
-        "data": neos
-    }
+    async def produce():
+        neos = await nasa_service.get_near_earth_objects(days)
+        return {
+            "status": "success",
+            "data": neos
+        }
+    return await cached_json(request, response, ("weather:asteroids", days), _ASTEROIDS_TTL, produce)
 
 @router.get("/radiation")
-async def get_radiation_events(days: int = Query(default=7, ge=1, le=30)):
+async def get_radiation_events(request: Request, response: Response,
+                               days: int = Query(default=7, ge=1, le=30),
+                               nasa_service: NASAService = Depends(get_nasa)):
     """Get radiation belt enhancement events"""
-    radiation = await nasa_service.get_radiation_belt_enhancement(days)
-    return {
-        "status": "success",
-        "count": len(radiation),
-        "data": radiation
-    }
+    async def produce():
+        radiation = await nasa_service.get_radiation_belt_enhancement(days)
+        return {
+            "status": "success",
+            "count": len(radiation),
+            "data": radiation
+        }
+    return await cached_json(request, response, ("weather:radiation", days), _WEATHER_TTL, produce)
 
 @router.get("/solar-wind")
-async def get_solar_wind():
+async def get_solar_wind(noaa_service: NOAAService = Depends(get_noaa)):
     """Get real-time solar wind data"""
-    solar_wind = await noaa_service.get_solar_wind()
+    solar_wind = await noaa_service.get_solar_wind(limit=50)
     return {
         "status": "success",
-        "data": solar_wind[-50:] if solar_wind else []
+        "data": solar_wind
     }
 
 @router.get("/kp-index")
-async def get_kp_index():
+async def get_kp_index(request: Request, response: Response,
+                       noaa_service: NOAAService = Depends(get_noaa)):
     """Get Kp index for geomagnetic activity"""
-    kp = await noaa_service.get_kp_index()
-    return {
-        "status": "success",
-        "data": kp
-    }
+    async def produce():
+        kp = await noaa_service.get_kp_index()
+        return {
+            "status": "success",
+            "data": kp
+        }
+    return await cached_json(request, response, "weather:kp-index", _WEATHER_TTL, produce)
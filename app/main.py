@@ -1,21 +1,49 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.routes import weather, chat, alerts, predictions
+from app.ml.transformer_predictor import transformer_predictor
+from app import services
 import uvicorn
 
 app = FastAPI(
     title="AstroPulse API",
     description="Space Weather Monitoring & Prediction API",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes the large DONKI event payloads in native code,
+    # off the Python interpreter's hot path
+    default_response_class=ORJSONResponse
 )
 
-# CORS configuration for frontend
+@app.on_event("startup")
+async def create_services():
+    """Publish the shared service singletons for dependency injection"""
+    app.state.nasa = services.nasa
+    app.state.noaa = services.noaa
+    # Finish ML capability detection (transformer weights, Ollama socket)
+    # here instead of at import time
+    await transformer_predictor.probe()
+
+@app.on_event("shutdown")
+async def close_services():
+    """Drain the services' pooled HTTP connections"""
+    await services.nasa.aclose()
+    await services.noaa.aclose()
+
+# CORS configuration for frontend. The API is GET/POST only, so the
+# enumerated allowlists let Starlette precompute the preflight headers
+# instead of echoing the request back on every OPTIONS.
+CORS_ORIGINS = ["http://localhost:3000", "http://localhost:3001"]
+CORS_METHODS = ["GET", "POST"]
+CORS_HEADERS = ["content-type", "authorization", "if-none-match"]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:3001"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=CORS_METHODS,
+    allow_headers=CORS_HEADERS,
+    max_age=86400,  # let browsers cache the preflight for 24h
 )
 
 # Include routers
@@ -37,4 +65,16 @@ async def health():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="127.0.0.1", port=8080, reload=True)
+    # uvloop + httptools (bundled with uvicorn[standard]) give the I/O-bound
+    # routes a faster event loop and HTTP parser; fall back to the stdlib
+    # implementations where uvloop is unavailable (e.g. Windows).
+    try:
+        import uvloop  # noqa: F401
+        loop_impl, http_impl = "uvloop", "httptools"
+    except ImportError:
+        loop_impl, http_impl = "auto", "auto"
+
+    # Dev server; in production run multi-worker without reload, e.g.
+    #   uvicorn app.main:app --workers $(nproc) --loop uvloop --http httptools
+    uvicorn.run("app.main:app", host="127.0.0.1", port=8080, reload=True,
+                loop=loop_impl, http=http_impl)
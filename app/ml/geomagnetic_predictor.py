@@ -0,0 +1,140 @@
+"""
+Geomagnetic Storm and CME Arrival Prediction
+
+Split out of the flare predictor so these genuinely distinct forecasts can
+be imported without pulling in the ML flare model.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from app.ml.preprocessing import parse_kp
+from app.utils import now_iso
+
+# Warning/impact sets per tier; module-level tuples so the response path
+# doesn't rebuild the same strings every call
+_CME_WARNINGS_FAST = (
+    "Geomagnetic storm expected",
+    "Satellite operations may be affected",
+    "Aurora visible at lower latitudes"
+)
+_CME_WARNINGS_SLOW = (
+    "Minor geomagnetic activity possible",
+    "Aurora may be visible at high latitudes"
+)
+
+_STORM_IMPACTS_SEVERE = (
+    "Widespread power grid problems possible",
+    "Spacecraft operations significantly affected",
+    "HF radio blackouts in many areas",
+    "GPS navigation errors likely"
+)
+_STORM_IMPACTS_MODERATE = (
+    "Power systems may experience voltage alarms",
+    "Spacecraft may need corrective actions",
+    "HF radio propagation affected",
+    "GPS accuracy reduced"
+)
+_STORM_IMPACTS_MINOR = (
+    "Minimal impact expected",
+    "Possible minor fluctuations in power grids",
+    "Aurora visible at high latitudes"
+)
+
+
+class GeomagneticPredictor:
+    """
+    Geomagnetic storm and CME arrival prediction
+    Uses Kp history and CME kinematics to forecast storm conditions
+    """
+
+    def __init__(self):
+        self.model_version = "1.0.0"
+
+    def predict_cme_arrival(self, cme_speed: float, detection_time: str) -> Dict:
+        """
+        Predict when a CME will arrive at Earth
+
+        Args:
+            cme_speed: Speed in km/s
+            detection_time: ISO format timestamp
+        """
+        if not cme_speed or cme_speed < 200:
+            return {
+                "arrival_time": None,
+                "impact_probability": 0,
+                "message": "CME not Earth-directed or too slow"
+            }
+
+        # Distance from Sun to Earth: ~150 million km
+        distance_km = 150_000_000
+
+        # Calculate travel time
+        travel_time_hours = distance_km / (cme_speed * 3600)
+
+        # Add detection time
+        detection = datetime.fromisoformat(detection_time.replace('Z', '+00:00'))
+        arrival = detection + timedelta(hours=travel_time_hours)
+
+        # Calculate impact probability based on speed
+        impact_prob = min((cme_speed / 2000) * 0.8, 0.95)
+
+        return {
+            "detection_time": detection_time,
+            "cme_speed": f"{cme_speed} km/s",
+            "estimated_arrival": arrival.isoformat(),
+            "arrival_window": f"{travel_time_hours - 6:.1f} to {travel_time_hours + 6:.1f} hours",
+            "impact_probability": round(impact_prob, 2),
+            "severity": "high" if cme_speed >= 1000 else "moderate",
+            "warnings": _CME_WARNINGS_FAST if cme_speed >= 1000 else _CME_WARNINGS_SLOW
+        }
+
+    def predict_geomagnetic_storm(self, kp_history: List, cme_incoming: bool = False) -> Dict:
+        """
+        Predict geomagnetic storm intensity
+
+        Args:
+            kp_history: Recent Kp index values
+            cme_incoming: Whether a CME is expected
+        """
+        if kp_history is None or len(kp_history) == 0:
+            return {
+                "storm_probability": 0.1,
+                "max_kp_predicted": 2,
+                "storm_level": "None"
+            }
+
+        # Parse only the 5-row tail (pass-through when the caller already
+        # parsed the history); for 5 values a plain sum/len beats a NumPy
+        # mean dispatch with its temporary allocation
+        recent_kp = parse_kp(kp_history[-5:])
+        avg_kp = sum(recent_kp) / recent_kp.size if recent_kp.size else 0.0
+
+        # Predict based on trend and CME
+        if cme_incoming:
+            predicted_kp = min(avg_kp + 3, 9)
+            storm_prob = 0.85
+        else:
+            predicted_kp = min(avg_kp + 1, 7)
+            storm_prob = 0.3 if avg_kp > 4 else 0.1
+
+        # Determine storm level
+        if predicted_kp >= 7:
+            storm_level = "Severe (G4-G5)"
+            impacts = _STORM_IMPACTS_SEVERE
+        elif predicted_kp >= 5:
+            storm_level = "Moderate (G2-G3)"
+            impacts = _STORM_IMPACTS_MODERATE
+        else:
+            storm_level = "Minor (G1) or None"
+            impacts = _STORM_IMPACTS_MINOR
+
+        return {
+            "timestamp": now_iso(),
+            "current_kp": round(avg_kp, 1),
+            "predicted_max_kp": round(predicted_kp, 1),
+            "storm_probability": round(storm_prob, 2),
+            "storm_level": storm_level,
+            "forecast_period": "24 hours",
+            "impacts": impacts
+        }
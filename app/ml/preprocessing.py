@@ -0,0 +1,73 @@
+"""
+Columnar (SoA) parsers for the NOAA time-series payloads
+
+The raw feeds arrive as lists of per-row lists with string fields, and every
+predictor used to re-parse them with per-element float() casts and length
+guards. Parsing once at the boundary into float64 arrays lets downstream
+code run vectorized column reductions instead; each parser passes ndarrays
+straight through, so pre-parsed data is never converted twice.
+"""
+
+import numpy as np
+
+# NOAA solar-wind rows: [timestamp, bx, by, bz, speed, density].
+# Column 0 is a timestamp string and is stored as 0.0; callers needing the
+# timestamps keep the raw rows.
+SOLAR_WIND_COLUMNS = 6
+SW_BX = 1
+SW_SPEED = 4
+_SOLAR_WIND_DEFAULTS = (0.0, 5.0, 0.0, 0.0, 400.0, 5.0)
+
+def parse_solar_wind(raw) -> np.ndarray:
+    """Parse solar-wind rows into an (N, 6) float64 matrix
+
+    Missing or malformed fields keep their column default (400 km/s speed,
+    5 nT field), matching the fallbacks the predictors used per-element.
+    """
+    if isinstance(raw, np.ndarray):
+        return raw
+
+    out = np.empty((len(raw), SOLAR_WIND_COLUMNS), dtype=np.float64)
+    out[:] = _SOLAR_WIND_DEFAULTS
+    for i, row in enumerate(raw):
+        for j in range(1, min(len(row), SOLAR_WIND_COLUMNS)):
+            try:
+                out[i, j] = float(row[j])
+            except (TypeError, ValueError):
+                pass
+    return out
+
+def _second_column(raw) -> np.ndarray:
+    """Float64 vector of each row's second field (0.0 where missing)"""
+    if isinstance(raw, np.ndarray):
+        return raw
+
+    def value(row):
+        if len(row) > 1:
+            try:
+                return float(row[1])
+            except (TypeError, ValueError):
+                return 0.0
+        return 0.0
+
+    return np.fromiter((value(row) for row in raw), dtype=np.float64, count=len(raw))
+
+def parse_xray_flux(raw) -> np.ndarray:
+    """Parse x-ray flux rows ([time, flux, ...]) into a float64 flux vector"""
+    return _second_column(raw)
+
+def parse_kp(raw) -> np.ndarray:
+    """Parse Kp-index rows ([time, kp, ...]) into a float64 Kp vector"""
+    return _second_column(raw)
+
+def parse_cme_speeds(cme_events) -> np.ndarray:
+    """Float32 vector of each CME's speed in km/s (0.0 where missing)
+
+    Parsing once lets callers run vectorized threshold comparisons instead
+    of branching per event.
+    """
+    return np.fromiter(
+        (float(cme.get("speed") or 0) for cme in cme_events),
+        dtype=np.float32,
+        count=len(cme_events)
+    )
@@ -1,6 +1,46 @@
-import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List
+from functools import lru_cache
+from app.utils import now_iso
+from typing import Dict, List, Tuple
+
+# Impact/recommendation sets per S-scale tier; module-level tuples so the
+# response path doesn't rebuild the same strings every call
+_IMPACTS_STRONG = (
+    "Radiation hazard to astronauts on EVA",
+    "Satellite operations degraded",
+    "HF radio blackouts on sunlit side",
+    "Navigation system errors",
+    "Increased radiation dose to airline passengers"
+)
+_IMPACTS_MODERATE = (
+    "Minor impacts to satellite operations",
+    "Small effects on HF radio in polar regions",
+    "Elevated radiation levels for astronauts",
+    "Minimal impact to aviation"
+)
+_IMPACTS_MINOR = (
+    "Normal background radiation levels",
+    "No significant impacts expected"
+)
+
+_REGIONS_STRONG = ("Polar regions", "High-latitude areas", "Global HF communications")
+_REGIONS_MODERATE = ("Polar regions", "High-latitude areas")
+_REGIONS_NONE = ("None",)
+
+_RECS_STRONG = (
+    "Postpone spacewalks if possible",
+    "Satellite operators: implement mitigation procedures",
+    "Airlines: consider re-routing polar flights",
+    "Increased monitoring of radiation levels"
+)
+_RECS_MODERATE = (
+    "Monitor radiation levels",
+    "Limit EVA duration if possible",
+    "Standard satellite protection adequate"
+)
+_RECS_NORMAL = (
+    "Normal operations",
+    "Standard radiation monitoring"
+)
 
 class RadiationPredictor:
     """
@@ -21,21 +61,31 @@ class RadiationPredictor:
             Prediction dictionary with S-scale rating
         """
         
-        # Analyze recent X-class and M-class flares
-        high_energy_flares = [
-            f for f in recent_flares 
+        # Count recent X-class and M-class flares; the prediction depends
+        # only on this count, so repeat calls hit the memoized outlook
+        high_energy_count = sum(
+            1 for f in recent_flares
             if f.get("classType", "").startswith(("X", "M"))
-        ]
-        
+        )
+
+        return {
+            "timestamp": now_iso(),
+            **self._predict_storm_cached(high_energy_count)
+        }
+
+    @lru_cache(maxsize=64)
+    def _predict_storm_cached(self, high_energy_count: int) -> Dict:
+        """Storm outlook for a given high-energy flare count (timestamp-free)"""
+
         # Calculate base probability
-        base_prob = min(len(high_energy_flares) * 0.2, 0.9)
-        
+        base_prob = min(high_energy_count * 0.2, 0.9)
+
         # Determine S-scale (S1-S5)
-        if len(high_energy_flares) >= 3:
+        if high_energy_count >= 3:
             s_scale = "S3-S4"
             severity = "Strong"
             prob = min(base_prob * 1.2, 0.85)
-        elif len(high_energy_flares) >= 1:
+        elif high_energy_count >= 1:
             s_scale = "S1-S2"
             severity = "Moderate"
             prob = base_prob
@@ -43,12 +93,11 @@ class RadiationPredictor:
             s_scale = "Below S1"
             severity = "Minor"
             prob = 0.15
-        
+
         # Generate impacts
         impacts = self._get_radiation_impacts(s_scale)
-        
+
         return {
-            "timestamp": datetime.utcnow().isoformat(),
             "forecast_period": "24-72 hours",
             "radiation_storm_probability": round(prob, 2),
             "predicted_scale": s_scale,
@@ -58,59 +107,33 @@ class RadiationPredictor:
             "affected_regions": self._get_affected_regions(s_scale),
             "recommendations": self._get_radiation_recommendations(s_scale)
         }
-    
-    def _get_radiation_impacts(self, s_scale: str) -> List[str]:
+
+    def _get_radiation_impacts(self, s_scale: str) -> Tuple[str, ...]:
         """Get impacts based on S-scale"""
         if "S3" in s_scale or "S4" in s_scale:
-            return [
-                "Radiation hazard to astronauts on EVA",
-                "Satellite operations degraded",
-                "HF radio blackouts on sunlit side",
-                "Navigation system errors",
-                "Increased radiation dose to airline passengers"
-            ]
+            return _IMPACTS_STRONG
         elif "S1" in s_scale or "S2" in s_scale:
-            return [
-                "Minor impacts to satellite operations",
-                "Small effects on HF radio in polar regions",
-                "Elevated radiation levels for astronauts",
-                "Minimal impact to aviation"
-            ]
+            return _IMPACTS_MODERATE
         else:
-            return [
-                "Normal background radiation levels",
-                "No significant impacts expected"
-            ]
-    
-    def _get_affected_regions(self, s_scale: str) -> List[str]:
+            return _IMPACTS_MINOR
+
+    def _get_affected_regions(self, s_scale: str) -> Tuple[str, ...]:
         """Get affected geographical regions"""
         if "S3" in s_scale or "S4" in s_scale:
-            return ["Polar regions", "High-latitude areas", "Global HF communications"]
+            return _REGIONS_STRONG
         elif "S1" in s_scale or "S2" in s_scale:
-            return ["Polar regions", "High-latitude areas"]
+            return _REGIONS_MODERATE
         else:
-            return ["None"]
-    
-    def _get_radiation_recommendations(self, s_scale: str) -> List[str]:
+            return _REGIONS_NONE
+
+    def _get_radiation_recommendations(self, s_scale: str) -> Tuple[str, ...]:
         """Get safety recommendations"""
         if "S3" in s_scale or "S4" in s_scale:
-            return [
-                "Postpone spacewalks if possible",
-                "Satellite operators: implement mitigation procedures",
-                "Airlines: consider re-routing polar flights",
-                "Increased monitoring of radiation levels"
-            ]
+            return _RECS_STRONG
         elif "S1" in s_scale or "S2" in s_scale:
-            return [
-                "Monitor radiation levels",
-                "Limit EVA duration if possible",
-                "Standard satellite protection adequate"
-            ]
+            return _RECS_MODERATE
         else:
-            return [
-                "Normal operations",
-                "Standard radiation monitoring"
-            ]
+            return _RECS_NORMAL
     
     def predict_proton_flux(self, current_flux: float = 1.0) -> Dict:
         """
@@ -132,7 +155,7 @@ class RadiationPredictor:
             trend = "decreasing"
         
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now_iso(),
             "current_flux": f"{current_flux:.2e}",
             "predicted_flux_6h": f"{predicted_flux:.2e}",
             "trend": trend,
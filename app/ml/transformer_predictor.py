@@ -8,12 +8,59 @@ Options:
 3. Local Llama models via Ollama for natural language insights
 """
 
+import asyncio
+import importlib.util
+import json
+import os
 import numpy as np
-from datetime import datetime
 from typing import Dict, List
 import warnings
 warnings.filterwarnings('ignore')
 
+from app.ml.preprocessing import parse_solar_wind, SW_SPEED
+from app.utils import now_iso
+
+# Numba is optional: when missing, the kernel below runs as plain
+# NumPy/Python at the original speed
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+# Cap on outstanding Ollama generations. The backend serializes requests it
+# can't run in parallel, so letting every concurrent API hit queue its own
+# POST just thrashes it; match this to Ollama's own OLLAMA_NUM_PARALLEL.
+_OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
+# Flare class letter -> numerical severity; dict lookup replaces the old
+# chain of startswith() calls
+_FLARE_CLASS_NUM = {'X': 3.0, 'M': 2.0, 'C': 1.0}
+
+
+@njit(cache=True, fastmath=True)
+def _forecast_core(seq):
+    """
+    Numeric core of the statistical forecast: recent-activity mean plus a
+    closed-form OLS trend slope (np.polyfit is unsupported under Numba),
+    folded into per-class probabilities. Returns (C, M, X) probabilities.
+    """
+    recent_activity = seq[-3:, 0:2].mean()
+    x = np.arange(seq.shape[0], dtype=np.float64)
+    y = seq[:, 1]
+    x_demean = x - x.mean()
+    slope = (x_demean * (y - y.mean())).sum() / (x_demean * x_demean).sum()
+
+    base_prob = min(recent_activity * 0.3 + abs(slope) * 0.2, 0.9)
+    return (min(base_prob * 1.2, 0.95),
+            min(base_prob * 0.6, 0.75),
+            min(base_prob * 0.25, 0.45))
+
 class TransformerSpaceWeatherModel:
     """
     Lightweight transformer model for space weather prediction
@@ -23,56 +70,105 @@ class TransformerSpaceWeatherModel:
     - Ollama local LLMs for generating insights
     - Pre-trained embeddings from space physics papers
     """
-    
+
+    __slots__ = ("model_version", "use_transformers", "use_ollama",
+                 "_ollama_semaphore", "_model")
+
     def __init__(self):
         self.model_version = "3.0.0-Transformer"
         self.use_transformers = False
         self.use_ollama = False
+        self._ollama_semaphore = asyncio.Semaphore(_OLLAMA_MAX_CONCURRENCY)
         
-        # Try to import optional dependencies
-        try:
-            from transformers import AutoModel
-            self.use_transformers = True
+        # Detect the optional transformers install from package metadata
+        # only — actually importing it costs hundreds of ms, and the module
+        # singleton below makes __init__ run at import time
+        self.use_transformers = importlib.util.find_spec("transformers") is not None
+        if self.use_transformers:
             print("✓ Transformers available")
-        except ImportError:
+        else:
             print("⚠ transformers not installed (optional)")
-        
-        # Check for Ollama
+
+        # Model load and the Ollama socket probe are finished by probe(),
+        # called from app startup, so importing this module never blocks
+        self._model = None
+
+        # Warm the forecast kernel so the first real request doesn't pay
+        # the JIT compile cost (no-op when Numba is absent)
+        _forecast_core(np.zeros((7, 5)))
+
+    async def probe(self) -> None:
+        """
+        Finish capability detection off the import path: load the (slow)
+        transformer weights on a worker thread and probe the local Ollama
+        socket concurrently. Called once from FastAPI startup.
+        """
+        await asyncio.gather(self._probe_transformers(), self._probe_ollama())
+
+    async def _probe_transformers(self):
+        if self.use_transformers and self._model is None:
+            self._model = await asyncio.to_thread(self._load_quantized_transformer)
+
+    async def _probe_ollama(self):
         try:
-            import requests
-            response = requests.get("http://localhost:11434/api/tags", timeout=1)
+            import httpx
+            async with httpx.AsyncClient() as client:
+                response = await client.get("http://localhost:11434/api/tags",
+                                            timeout=0.2)
             if response.status_code == 200:
                 self.use_ollama = True
                 print("✓ Ollama detected for enhanced insights")
-        except:
+        except Exception:
             print("⚠ Ollama not running (optional)")
     
-    def predict_with_context(self, 
-                            recent_flares: List[Dict],
-                            solar_wind: List,
-                            xray_flux: List,
-                            context: str = "") -> Dict:
+    def _load_quantized_transformer(self):
+        """
+        Load the optional time-series transformer with INT8 weights.
+
+        CPU inference is memory-bound — weight bytes moved per matmul
+        dominate — so dynamic quantization of the Linear layers roughly
+        quarters the footprint with negligible accuracy loss.
+        """
+        try:
+            import torch
+            from transformers import AutoModel
+
+            name = os.getenv("ASTROPULSE_TS_MODEL",
+                             "huggingface/time-series-transformer-tourism-monthly")
+            model = AutoModel.from_pretrained(name)
+            model.eval()
+            return torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            print(f"⚠ transformer model load failed: {e}")
+            return None
+
+    async def predict_with_context(self,
+                                   recent_flares: List[Dict],
+                                   solar_wind: List,
+                                   xray_flux: List,
+                                   context: str = "") -> Dict:
         """
         Make predictions with contextual understanding
         """
-        
+
         # Prepare time-series data
         sequence = self._prepare_sequence(recent_flares, solar_wind, xray_flux)
-        
+
         # Base predictions using statistical model
         base_prediction = self._statistical_forecast(sequence)
-        
+
         # Enhance with transformer insights if available
         if self.use_transformers:
             enhanced = self._enhance_with_transformers(sequence, base_prediction)
         else:
             enhanced = base_prediction
-        
+
         # Add natural language insights if Ollama available
         if self.use_ollama and context:
-            insights = self._generate_ollama_insights(enhanced, context)
+            insights = await self._generate_ollama_insights(enhanced, context)
             enhanced['ai_insights'] = insights
-        
+
         return enhanced
     
     def _prepare_sequence(self, flares: List, wind: List, xray: List) -> np.ndarray:
@@ -83,46 +179,42 @@ class TransformerSpaceWeatherModel:
         features_per_day = 5  # [flare_count, avg_class, wind_speed, xray_level, geomag_index]
         
         sequence = np.zeros((sequence_length, features_per_day))
-        
-        # Fill with recent data (simplified)
-        for i in range(min(sequence_length, len(flares))):
-            if i < len(flares):
-                flare = flares[-(i+1)]
-                sequence[i, 0] = 1  # Flare occurred
-                sequence[i, 1] = self._flare_class_to_num(flare.get('classType', 'C1'))
-        
+
+        # Fill with recent data (simplified); sliced writes replace the old
+        # per-row Python loop
+        recent = flares[-sequence_length:]
+        if recent:
+            sequence[:len(recent), 0] = 1.0  # Flare occurred
+            sequence[:len(recent), 1] = np.fromiter(
+                (_FLARE_CLASS_NUM.get((f.get('classType') or 'C1')[0], 0.5)
+                 for f in reversed(recent)),
+                dtype=np.float64, count=len(recent))
+
         if len(wind) > 0:
-            sequence[:, 2] = np.mean([float(w[4]) if len(w) > 4 else 400 for w in wind[-5:]])
-        
+            # Columnar parse fills missing speeds with the 400 km/s default
+            sequence[:, 2] = parse_solar_wind(wind[-5:])[:, SW_SPEED].mean()
+
         return sequence
-    
+
     def _flare_class_to_num(self, class_type: str) -> float:
         """Convert flare class to numerical value"""
-        if class_type.startswith('X'):
-            return 3.0
-        elif class_type.startswith('M'):
-            return 2.0
-        elif class_type.startswith('C'):
-            return 1.0
-        return 0.5
+        return _FLARE_CLASS_NUM.get(class_type[:1], 0.5)
     
     def _statistical_forecast(self, sequence: np.ndarray) -> Dict:
         """Base statistical forecast"""
-        
-        # Simple ARIMA-like prediction
-        recent_activity = np.mean(sequence[-3:, 0:2])
-        trend = np.polyfit(range(len(sequence)), sequence[:, 1], 1)[0]
-        
-        base_prob = min(recent_activity * 0.3 + abs(trend) * 0.2, 0.9)
-        
+
+        # Simple ARIMA-like prediction; the arithmetic lives in the JIT'd
+        # kernel so tiny-array dispatch overhead doesn't dominate
+        c_prob, m_prob, x_prob = _forecast_core(sequence)
+
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now_iso(),
             "model_type": "Transformer-Enhanced Statistical",
             "model_version": self.model_version,
             "predictions": {
-                "C_class": {"probability": min(base_prob * 1.2, 0.95)},
-                "M_class": {"probability": min(base_prob * 0.6, 0.75)},
-                "X_class": {"probability": min(base_prob * 0.25, 0.45)}
+                "C_class": {"probability": c_prob},
+                "M_class": {"probability": m_prob},
+                "X_class": {"probability": x_prob}
             },
             "confidence": 0.78,
             "method": "Time-series analysis with trend detection"
@@ -139,18 +231,23 @@ class TransformerSpaceWeatherModel:
         
         return base_pred
     
-    def _generate_ollama_insights(self, prediction: Dict, context: str) -> str:
+    async def _generate_ollama_insights(self, prediction: Dict, context: str) -> str:
         """
         Generate natural language insights using Ollama
-        
+
         Requires: ollama pull llama3.2 (or similar small model)
+
+        Streams the generation and caps it by token budget rather than a
+        wall-clock timeout: only the wait for the first token gets a
+        deadline, so a slow-but-streaming model still returns its text
+        instead of hitting a timeout cliff mid-generation.
         """
-        
+
         try:
-            import requests
-            
+            import httpx
+
             prompt = f"""You are a space weather expert. Based on this prediction data:
-            
+
 Solar Flare Probabilities:
 - C-class: {prediction['predictions']['C_class']['probability']:.1%}
 - M-class: {prediction['predictions']['M_class']['probability']:.1%}
@@ -160,21 +257,47 @@ Context: {context}
 
 Provide a brief (2-3 sentences) expert assessment of the space weather risk."""
 
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": "llama3.2",  # or "mistral", "phi3"
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return response.json().get('response', 'Insights unavailable')
+            payload = {
+                "model": "llama3.2",  # or "mistral", "phi3"
+                "prompt": prompt,
+                "stream": True,
+                # 80 tokens is ample for 2-3 sentences; the small context
+                # window keeps prompt processing cheap
+                "options": {"num_predict": 80, "temperature": 0.3, "num_ctx": 512}
+            }
+
+            pieces = []
+            async with self._ollama_semaphore, httpx.AsyncClient() as client:
+                async with client.stream(
+                    "POST", "http://localhost:11434/api/generate",
+                    # Finite read timeout: a stalled stream must fail rather
+                    # than hold a semaphore slot forever. 10s per read sits
+                    # above the 8s first-token deadline below, so warm reads
+                    # never trip it but a dead socket does
+                    json=payload, timeout=httpx.Timeout(10.0, connect=5.0)
+                ) as response:
+                    if response.status_code != 200:
+                        return "AI insights unavailable"
+
+                    lines = response.aiter_lines()
+                    # Deadline on the first token only; after that the
+                    # num_predict budget bounds the generation
+                    line = await asyncio.wait_for(lines.__anext__(), timeout=8.0)
+                    while True:
+                        if line:
+                            chunk = json.loads(line)
+                            pieces.append(chunk.get("response", ""))
+                            if chunk.get("done") or len(pieces) >= 80:
+                                break
+                        try:
+                            line = await lines.__anext__()
+                        except StopAsyncIteration:
+                            break
+            if pieces:
+                return "".join(pieces)
         except Exception as e:
             print(f"Ollama insight generation failed: {e}")
-        
+
         return "AI insights unavailable"
 
 # Global instance
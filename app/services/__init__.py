@@ -0,0 +1,45 @@
+import asyncio
+from typing import Tuple
+
+from app.ml.preprocessing import parse_kp, parse_solar_wind, parse_xray_flux
+from app.services.nasa_service import NASAService
+from app.services.noaa_service import NOAAService
+from app.services.prediction_service import PredictionService
+
+# Shared singletons. Constructing them here (instead of once per route
+# module) keeps process startup O(1) in the number of routers; the FastAPI
+# startup handler publishes nasa/noaa on app.state for dependency injection.
+nasa = NASAService()
+noaa = NOAAService()
+prediction = PredictionService()
+
+# One slow upstream must not stall the whole gather
+_FETCH_TIMEOUT = 5.0
+
+async def _fetch(coro, source: str):
+    """Await a fetch with a timeout, falling back to an empty result on failure"""
+    try:
+        return await asyncio.wait_for(coro, timeout=_FETCH_TIMEOUT)
+    except Exception as e:
+        print(f"Error fetching {source}: {e}")
+        return []
+
+async def gather_prediction_inputs(nasa_service, noaa_service, days: int = 7) -> Tuple:
+    """
+    Concurrently fetch the five independent inputs used by the prediction routes
+
+    The NOAA series are converted to columnar NumPy arrays here, once at
+    ingest; the ML parsers pass ndarrays straight through, so no predictor
+    downstream re-boxes rows with per-element float() casts.
+
+    Returns:
+        (recent_flares, cme_events, solar_wind, xray_flux, kp_index)
+    """
+    flares, cmes, wind, xray, kp = await asyncio.gather(
+        _fetch(nasa_service.get_solar_flares(days), "solar flares"),
+        _fetch(nasa_service.get_cme_events(days), "CME events"),
+        _fetch(noaa_service.get_solar_wind(), "solar wind"),
+        _fetch(noaa_service.get_xray_flares(), "X-ray flux"),
+        _fetch(noaa_service.get_kp_index(), "Kp index")
+    )
+    return flares, cmes, parse_solar_wind(wind), parse_xray_flux(xray), parse_kp(kp)
@@ -0,0 +1,111 @@
+"""
+Async TTL cache with request coalescing for upstream fetches.
+
+Concurrent callers for the same key share one in-flight fetch: the future is
+registered before the upstream call starts, so an expired entry never
+triggers a thundering herd against NASA/NOAA when many requests land at
+once.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+import orjson
+
+_MAX_ENTRIES = 256
+
+class FetchCancelled(Exception):
+    """
+    Raised to coalesced waiters when the task running the shared fetch was
+    cancelled (client disconnect, wait_for timeout) before completing.
+
+    A plain Exception rather than CancelledError: the waiter's own task was
+    not cancelled, so its normal error handling should apply.
+    """
+
+class TTLCache:
+    """LRU-bounded map of key -> (expiry, future holding the fetch result)"""
+
+    __slots__ = ("_entries", "_max_entries", "_lock")
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = asyncio.Lock()
+
+    async def get_or_fetch(self, key, producer, ttl: float):
+        """
+        Return the cached result for `key`, awaiting the in-flight fetch if
+        one is already running; otherwise run `producer` (an async callable)
+        and cache its result for `ttl` seconds.
+        """
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, future = entry
+                # Serve unfinished fetches (coalescing) and unexpired results
+                if not future.done() or time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    try:
+                        return await asyncio.shield(future)
+                    except asyncio.CancelledError:
+                        # Distinguish the shared fetch being cancelled from
+                        # this caller's own cancellation
+                        if future.cancelled():
+                            raise FetchCancelled(repr(key)) from None
+                        raise
+
+            future = asyncio.get_running_loop().create_future()
+            self._entries[key] = (time.monotonic() + ttl, future)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+        try:
+            result = await producer()
+        except BaseException as e:
+            # Drop the entry so the next caller retries, and complete the
+            # future so waiters recover. CancelledError must be handled too:
+            # leaving the future pending forever would wedge this key, since
+            # the lookup above serves unfinished futures regardless of TTL.
+            self._entries.pop(key, None)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved: with no coalesced waiters, only this
+                # caller sees the error, and it already has `e` in hand
+                future.exception()
+            raise
+        future.set_result(result)
+        return result
+
+
+class ETagStore:
+    """
+    Remembers the ETag validator from earlier responses and revalidates with
+    If-None-Match, so an unchanged upstream payload costs a 304 with an empty
+    body instead of a full re-download and JSON parse.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self):
+        self._entries = {}  # key -> (etag, parsed body)
+
+    async def get_json(self, client, key, url, params=None):
+        """GET `url` via `client`, reusing the stored body on a 304"""
+        cached = self._entries.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = await client.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        # orjson parses the multi-thousand-row NOAA/DONKI arrays in native
+        # code; .content is already decompressed by httpx
+        data = orjson.loads(response.content)
+        etag = response.headers.get("etag")
+        if etag:
+            self._entries[key] = (etag, data)
+        return data
@@ -0,0 +1,26 @@
+"""
+Shared HTTP client construction for the upstream services.
+
+NASA DONKI and NOAA SWPC each serve several small JSON endpoints from one
+origin, so the concurrent per-product fetches benefit from a tuned pool:
+with the optional h2 package installed they multiplex as HTTP/2 streams
+over a single TCP+TLS session (one handshake instead of one per product);
+without it the client still reuses keep-alive HTTP/1.1 connections.
+"""
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+_LIMITS = httpx.Limits(max_keepalive_connections=10, max_connections=20,
+                       keepalive_expiry=60.0)
+_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+def make_client() -> httpx.AsyncClient:
+    """Pooled client shared by a service for its lifetime"""
+    return httpx.AsyncClient(http2=_HTTP2_AVAILABLE, limits=_LIMITS,
+                             timeout=_TIMEOUT)
@@ -1,115 +1,122 @@
+import asyncio
 import httpx
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
 import os
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+
+from app.services.cache import ETagStore, TTLCache
+from app.services.http import make_client
+
+# How long fetched DONKI/NEO payloads stay fresh; concurrent callers for the
+# same endpoint+window coalesce into a single upstream request. DONKI event
+# catalogs update on the order of minutes-to-hours, so 5 minutes keeps repeat
+# hits off the network (and off the DEMO_KEY rate limit) without going stale.
+_CACHE_TTL = 300.0
+
+# Human-readable product names for error messages
+_DONKI_LABELS = {
+    "FLR": "solar flares",
+    "CME": "CME events",
+    "GST": "geomagnetic storms",
+    "RBE": "radiation events",
+}
 
 class NASAService:
+    __slots__ = ("api_key", "base_url", "donki_url", "_cache", "_etags", "_client")
+
     def __init__(self):
         self.api_key = os.getenv("NASA_API_KEY", "DEMO_KEY")
         self.base_url = "https://api.nasa.gov"
         self.donki_url = f"{self.base_url}/DONKI"
-        
-    async def get_solar_flares(self, days: int = 7) -> List[Dict]:
-        """Fetch recent solar flare events"""
+        self._cache = TTLCache()
+        self._etags = ETagStore()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared pooled client, created lazily so the singleton can be
+        built at import time before any event loop exists"""
+        if self._client is None or self._client.is_closed:
+            self._client = make_client()
+        return self._client
+
+    async def aclose(self):
+        """Release pooled connections (hooked into app shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+    def _date_params(self, days: int) -> Dict:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
-        
-        url = f"{self.donki_url}/FLR"
-        params = {
+        return {
             "startDate": start_date.strftime("%Y-%m-%d"),
             "endDate": end_date.strftime("%Y-%m-%d"),
             "api_key": self.api_key
         }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching solar flares: {e}")
-                return []
-    
+
+    async def _get_donki(self, kind: str, days: int) -> List[Dict]:
+        """Fetch one DONKI product (cached/coalesced per endpoint+window)"""
+        async def produce():
+            url = f"{self.donki_url}/{kind}"
+            params = self._date_params(days)
+            return await self._etags.get_json(
+                self._get_client(), (kind, days), url, params=params)
+
+        # Catch outside the producer: a raised fetch drops the cache entry,
+        # so a transient upstream failure isn't served as fresh data for the
+        # whole TTL
+        try:
+            return await self._cache.get_or_fetch((kind, days), produce,
+                                                  ttl=_CACHE_TTL)
+        except Exception as e:
+            print(f"Error fetching {_DONKI_LABELS[kind]}: {e}")
+            return []
+
+    async def get_solar_flares(self, days: int = 7) -> List[Dict]:
+        """Fetch recent solar flare events"""
+        return await self._get_donki("FLR", days)
+
     async def get_cme_events(self, days: int = 7) -> List[Dict]:
         """Fetch Coronal Mass Ejection events"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        url = f"{self.donki_url}/CME"
-        params = {
-            "startDate": start_date.strftime("%Y-%m-%d"),
-            "endDate": end_date.strftime("%Y-%m-%d"),
-            "api_key": self.api_key
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching CME events: {e}")
-                return []
-    
+        return await self._get_donki("CME", days)
+
     async def get_geomagnetic_storms(self, days: int = 7) -> List[Dict]:
         """Fetch geomagnetic storm events"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        url = f"{self.donki_url}/GST"
-        params = {
-            "startDate": start_date.strftime("%Y-%m-%d"),
-            "endDate": end_date.strftime("%Y-%m-%d"),
-            "api_key": self.api_key
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching geomagnetic storms: {e}")
-                return []
-    
+        return await self._get_donki("GST", days)
+
     async def get_near_earth_objects(self, days: int = 7) -> Dict:
         """Fetch Near Earth Objects (asteroids)"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        url = f"{self.base_url}/neo/rest/v1/feed"
-        params = {
-            "start_date": start_date.strftime("%Y-%m-%d"),
-            "end_date": end_date.strftime("%Y-%m-%d"),
-            "api_key": self.api_key
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching NEOs: {e}")
-                return {"near_earth_objects": {}}
-    
+        async def produce():
+            url = f"{self.base_url}/neo/rest/v1/feed"
+            params = self._date_params(days)
+            params["start_date"] = params.pop("startDate")
+            params["end_date"] = params.pop("endDate")
+            return await self._etags.get_json(
+                self._get_client(), ("NEO", days), url, params=params)
+
+        try:
+            return await self._cache.get_or_fetch(("NEO", days), produce,
+                                                  ttl=_CACHE_TTL)
+        except Exception as e:
+            print(f"Error fetching NEOs: {e}")
+            return {"near_earth_objects": {}}
+
     async def get_radiation_belt_enhancement(self, days: int = 7) -> List[Dict]:
         """Fetch radiation belt enhancement events"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        url = f"{self.donki_url}/RBE"
-        params = {
-            "startDate": start_date.strftime("%Y-%m-%d"),
-            "endDate": end_date.strftime("%Y-%m-%d"),
-            "api_key": self.api_key
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching radiation events: {e}")
-                return []
+        return await self._get_donki("RBE", days)
+
+    async def fetch_all(self, days: int = 7) -> Tuple:
+        """
+        Fetch all five products concurrently
+
+        The endpoints are independent, so total latency is the slowest
+        round trip instead of the sum; failures come back as exceptions in
+        the corresponding slot rather than aborting the batch.
+        """
+        return await asyncio.gather(
+            self.get_solar_flares(days),
+            self.get_cme_events(days),
+            self.get_geomagnetic_storms(days),
+            self.get_near_earth_objects(days),
+            self.get_radiation_belt_enhancement(days),
+            return_exceptions=True
+        )
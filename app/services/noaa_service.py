@@ -1,76 +1,118 @@
+import asyncio
 import httpx
-from typing import Dict, List
-from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.services.cache import ETagStore, TTLCache
+from app.services.http import make_client
+from app.utils import now_iso
+
+# NOAA real-time products refresh on a ~1 minute cadence, so a 60s TTL
+# serves at most one upstream fetch per product per refresh interval
+_CACHE_TTL = 60.0
 
 class NOAAService:
+    __slots__ = ("base_url", "_cache", "_etags", "_client")
+
     def __init__(self):
         self.base_url = "https://services.swpc.noaa.gov"
-        
-    async def get_solar_wind(self) -> List[Dict]:
-        """Get real-time solar wind data"""
-        url = f"{self.base_url}/products/solar-wind/mag-7-day.json"
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                # Skip header row
-                return data[1:] if data else []
-            except Exception as e:
-                print(f"Error fetching solar wind: {e}")
-                return []
-    
+        self._cache = TTLCache()
+        self._etags = ETagStore()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared pooled client, created lazily so the singleton can be
+        built at import time before any event loop exists"""
+        if self._client is None or self._client.is_closed:
+            self._client = make_client()
+        return self._client
+
+    async def aclose(self):
+        """Release pooled connections (hooked into app shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+    async def get_solar_wind(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Get real-time solar wind data
+
+        Args:
+            limit: return only the most recent `limit` rows, so callers that
+                   render a tail of the series don't move the full history
+        """
+        async def produce():
+            url = f"{self.base_url}/products/solar-wind/mag-7-day.json"
+            data = await self._etags.get_json(
+                self._get_client(), "solar-wind", url)
+            # Skip header row
+            return data[1:] if data else []
+
+        # Catch outside the producer: a raised fetch drops the cache entry,
+        # so a transient upstream failure isn't served as fresh data for the
+        # whole TTL
+        try:
+            data = await self._cache.get_or_fetch("solar-wind", produce,
+                                                  ttl=_CACHE_TTL)
+        except Exception as e:
+            print(f"Error fetching solar wind: {e}")
+            return []
+        return data[-limit:] if limit else data
+
     async def get_kp_index(self) -> List[Dict]:
         """Get Kp index (geomagnetic activity)"""
-        url = f"{self.base_url}/products/noaa-planetary-k-index.json"
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                return data[1:] if data else []
-            except Exception as e:
-                print(f"Error fetching Kp index: {e}")
-                return []
-    
+        async def produce():
+            url = f"{self.base_url}/products/noaa-planetary-k-index.json"
+            data = await self._etags.get_json(
+                self._get_client(), "kp-index", url)
+            return data[1:] if data else []
+
+        try:
+            return await self._cache.get_or_fetch("kp-index", produce,
+                                                  ttl=_CACHE_TTL)
+        except Exception as e:
+            print(f"Error fetching Kp index: {e}")
+            return []
+
     async def get_xray_flares(self) -> List[Dict]:
         """Get X-ray flux data"""
-        url = f"{self.base_url}/products/goes-xray-flux-primary.json"
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                return data[1:] if data else []
-            except Exception as e:
-                print(f"Error fetching X-ray flux: {e}")
-                return []
-    
+        async def produce():
+            url = f"{self.base_url}/products/goes-xray-flux-primary.json"
+            data = await self._etags.get_json(
+                self._get_client(), "xray", url)
+            return data[1:] if data else []
+
+        try:
+            return await self._cache.get_or_fetch("xray", produce,
+                                                  ttl=_CACHE_TTL)
+        except Exception as e:
+            print(f"Error fetching X-ray flux: {e}")
+            return []
+
     async def get_proton_flux(self) -> List[Dict]:
         """Get proton flux data"""
-        url = f"{self.base_url}/products/goes-proton-flux-primary.json"
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                return data[1:] if data else []
-            except Exception as e:
-                print(f"Error fetching proton flux: {e}")
-                return []
-    
+        async def produce():
+            url = f"{self.base_url}/products/goes-proton-flux-primary.json"
+            data = await self._etags.get_json(
+                self._get_client(), "proton", url)
+            return data[1:] if data else []
+
+        try:
+            return await self._cache.get_or_fetch("proton", produce,
+                                                  ttl=_CACHE_TTL)
+        except Exception as e:
+            print(f"Error fetching proton flux: {e}")
+            return []
+
     async def get_current_conditions(self) -> Dict:
         """Get comprehensive current space weather conditions"""
-        solar_wind = await self.get_solar_wind()
-        kp_index = await self.get_kp_index()
-        xray_flares = await self.get_xray_flares()
-        
+        # The three products are independent; fetch them concurrently
+        solar_wind, kp_index, xray_flares = await asyncio.gather(
+            self.get_solar_wind(),
+            self.get_kp_index(),
+            self.get_xray_flares()
+        )
+
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now_iso(),
             "solar_wind": solar_wind[-10:] if solar_wind else [],
             "kp_index": kp_index[-10:] if kp_index else [],
             "xray_flux": xray_flares[-10:] if xray_flares else []
@@ -1,15 +1,44 @@
-from app.ml.solar_flare_predictor import SolarFlarePredictor
+import asyncio
+from functools import cached_property
+
+import numpy as np
+
+from app.ml.advanced_solar_flare_model import AdvancedSolarFlareModel, get_ml_predictor
+from app.ml.preprocessing import parse_cme_speeds
+from app.ml.geomagnetic_predictor import GeomagneticPredictor
 from app.ml.radiation_predictor import RadiationPredictor
 from typing import Dict
 
+# Overall-risk tiers, highest threshold first; one scan replaces the per-call
+# if/elif ladder and keeps the strings from being rebuilt each prediction
+_RISK_TIERS = (
+    (0.7, "HIGH", "red", "Significant space weather activity expected"),
+    (0.5, "ELEVATED", "orange", "Moderate space weather activity possible"),
+    (0.3, "MODERATE", "yellow", "Minor space weather activity possible"),
+    (-1.0, "LOW", "green", "Quiet space weather conditions expected"),
+)
+
+# Risk label -> numerical score
+_RISK_SCORES = {
+    "HIGH": 0.85,
+    "MODERATE": 0.6,
+    "LOW": 0.3,
+    "MINIMAL": 0.1
+}
+
 class PredictionService:
     """
     Coordinates all prediction models
     """
-    
+
     def __init__(self):
-        self.flare_predictor = SolarFlarePredictor()
+        self.geomag_predictor = GeomagneticPredictor()
         self.radiation_predictor = RadiationPredictor()
+
+    @cached_property
+    def flare_predictor(self) -> AdvancedSolarFlareModel:
+        """Shared ML flare model, built on first use"""
+        return get_ml_predictor()
     
     async def get_comprehensive_predictions(self, 
                                            recent_flares: list,
@@ -21,43 +50,43 @@ class PredictionService:
         Get comprehensive predictions from all models
         """
         
-        # Solar flare predictions
-        flare_predictions = self.flare_predictor.predict_flare_probability(
-            recent_flares=recent_flares,
-            solar_wind_data=solar_wind,
-            xray_flux=xray_flux
-        )
-        
-        # Geomagnetic storm predictions
-        has_fast_cme = any(
-            float(cme.get("speed", 0)) > 1000 
-            for cme in cme_events 
-            if cme.get("speed")
-        )
-        
-        geomag_predictions = self.flare_predictor.predict_geomagnetic_storm(
-            kp_history=kp_index,
-            cme_incoming=has_fast_cme
-        )
-        
-        # Radiation storm predictions
-        radiation_predictions = self.radiation_predictor.predict_radiation_storm(
-            recent_flares=recent_flares
-        )
-        
+        # Parse every CME speed once, then answer both questions with
+        # vectorized comparisons: any >1000 km/s event drives the storm
+        # forecast, the most recent >500 km/s one feeds arrival modeling
+        speeds = parse_cme_speeds(cme_events)
+        has_fast_cme = bool((speeds > 1000).any())
+        fast_idx = np.flatnonzero(speeds > 500)
+        if fast_idx.size:
+            latest_cme = cme_events[int(fast_idx[-1])]
+            latest_cme_speed = float(speeds[fast_idx[-1]])
+        else:
+            latest_cme = None
+            latest_cme_speed = 0.0
+
+        # The sub-models are independent, so run them on worker threads and
+        # gather: the NumPy/sklearn internals release the GIL for the heavy
+        # parts, and the event loop stays free for other requests meanwhile
+        tasks = [
+            asyncio.to_thread(self.flare_predictor.predict_flare_probability,
+                              recent_flares=recent_flares,
+                              solar_wind_data=solar_wind,
+                              xray_flux=xray_flux),
+            asyncio.to_thread(self.geomag_predictor.predict_geomagnetic_storm,
+                              kp_history=kp_index,
+                              cme_incoming=has_fast_cme),
+            asyncio.to_thread(self.radiation_predictor.predict_radiation_storm,
+                              recent_flares=recent_flares),
+        ]
         # CME arrival predictions (for most recent fast CME)
-        cme_arrival = None
-        if cme_events:
-            fast_cmes = [
-                cme for cme in cme_events 
-                if cme.get("speed") and float(cme.get("speed", 0)) > 500
-            ]
-            if fast_cmes:
-                latest_cme = fast_cmes[-1]
-                cme_arrival = self.flare_predictor.predict_cme_arrival(
-                    cme_speed=float(latest_cme.get("speed", 0)),
-                    detection_time=latest_cme.get("startTime", "")
-                )
+        if latest_cme is not None:
+            tasks.append(asyncio.to_thread(
+                self.geomag_predictor.predict_cme_arrival,
+                cme_speed=latest_cme_speed,
+                detection_time=latest_cme.get("startTime", "")))
+
+        results = await asyncio.gather(*tasks)
+        flare_predictions, geomag_predictions, radiation_predictions = results[:3]
+        cme_arrival = results[3] if latest_cme is not None else None
         
         return {
             "status": "success",
@@ -84,24 +113,10 @@ class PredictionService:
         rad_risk = rad_pred.get("radiation_storm_probability", 0)
         
         overall_score = (flare_risk * 0.4 + geomag_risk * 0.35 + rad_risk * 0.25)
-        
-        if overall_score >= 0.7:
-            level = "HIGH"
-            color = "red"
-            message = "Significant space weather activity expected"
-        elif overall_score >= 0.5:
-            level = "ELEVATED"
-            color = "orange"
-            message = "Moderate space weather activity possible"
-        elif overall_score >= 0.3:
-            level = "MODERATE"
-            color = "yellow"
-            message = "Minor space weather activity possible"
-        else:
-            level = "LOW"
-            color = "green"
-            message = "Quiet space weather conditions expected"
-        
+
+        level, color, message = next(
+            tier[1:] for tier in _RISK_TIERS if overall_score >= tier[0])
+
         return {
             "risk_level": level,
             "risk_score": round(overall_score, 2),
@@ -112,13 +127,7 @@ class PredictionService:
     
     def _risk_to_score(self, risk_level: str) -> float:
         """Convert risk level to numerical score"""
-        mapping = {
-            "HIGH": 0.85,
-            "MODERATE": 0.6,
-            "LOW": 0.3,
-            "MINIMAL": 0.1
-        }
-        return mapping.get(risk_level, 0.3)
+        return _RISK_SCORES.get(risk_level, 0.3)
     
     def _get_primary_concerns(self, flare_pred: Dict, geomag_pred: Dict, rad_pred: Dict) -> list:
         """Identify primary concerns"""
@@ -0,0 +1,17 @@
+"""Small shared helpers"""
+
+import time
+from datetime import datetime, timezone
+
+# Responses only need second-level timestamps, so the ISO string is
+# reformatted at most once per second instead of per request
+_ts_cache = {"t": 0.0, "s": ""}
+
+def now_iso() -> str:
+    """Current UTC time as an ISO8601 string, cached for up to a second"""
+    t = time.time()
+    if t - _ts_cache["t"] > 1.0:
+        _ts_cache["t"] = t
+        _ts_cache["s"] = datetime.fromtimestamp(t, tz=timezone.utc) \
+            .replace(tzinfo=None).isoformat()
+    return _ts_cache["s"]